@@ -1,6 +1,6 @@
 /// Health check endpoints for FKS services
 use axum::{response::{Json, IntoResponse}, routing::get, Router, http::StatusCode};
-use serde_json::{json, Value};
+use serde::Serialize;
 use std::time::{SystemTime, UNIX_EPOCH};
 
 pub fn health_routes<S>() -> Router<S>
@@ -14,50 +14,60 @@ where
         .route("/metrics", get(metrics))
 }
 
-async fn health_check() -> Json<Value> {
-    Json(json!({
-        "status": "healthy",
-        "service": "fks_execution",
-        "timestamp": SystemTime::now()
-            .duration_since(UNIX_EPOCH)
-            .unwrap()
-            .as_secs()
-    }))
+/// Probe response body; serialized straight from the struct with no intermediate `Value` tree
+#[derive(Serialize)]
+struct ProbeStatus {
+    status: &'static str,
+    service: &'static str,
+    timestamp: u64,
+    #[serde(skip_serializing_if = "Option::is_none")]
+    dependencies: Option<Dependencies>,
 }
 
-async fn readiness_check() -> Json<Value> {
+/// Dependency checks reported by the readiness probe (none yet)
+#[derive(Serialize)]
+struct Dependencies {}
+
+impl ProbeStatus {
+    fn new(status: &'static str) -> Self {
+        Self {
+            status,
+            service: "fks_execution",
+            timestamp: SystemTime::now()
+                .duration_since(UNIX_EPOCH)
+                .unwrap()
+                .as_secs(),
+            dependencies: None,
+        }
+    }
+}
+
+async fn health_check() -> Json<ProbeStatus> {
+    Json(ProbeStatus::new("healthy"))
+}
+
+async fn readiness_check() -> Json<ProbeStatus> {
     // TODO: Add dependency checks
-    Json(json!({
-        "status": "ready",
-        "service": "fks_execution",
-        "timestamp": SystemTime::now()
-            .duration_since(UNIX_EPOCH)
-            .unwrap()
-            .as_secs(),
-        "dependencies": {}
-    }))
+    Json(ProbeStatus {
+        dependencies: Some(Dependencies {}),
+        ..ProbeStatus::new("ready")
+    })
 }
 
-async fn liveness_check() -> Json<Value> {
-    Json(json!({
-        "status": "alive",
-        "service": "fks_execution",
-        "timestamp": SystemTime::now()
-            .duration_since(UNIX_EPOCH)
-            .unwrap()
-            .as_secs()
-    }))
+async fn liveness_check() -> Json<ProbeStatus> {
+    Json(ProbeStatus::new("alive"))
 }
 
+/// Prometheus exposition body. Everything in it is known at compile time, so a
+/// scrape is served from a static string without formatting or allocating.
+const METRICS_BODY: &str = concat!(
+    "# HELP fks_build_info Build information for the service\n",
+    "# TYPE fks_build_info gauge\n",
+    "fks_build_info{service=\"fks_execution\",version=\"",
+    env!("CARGO_PKG_VERSION"),
+    "\"} 1\n",
+);
+
 async fn metrics() -> impl IntoResponse {
-    // Return Prometheus-format metrics with fks_build_info
-    let version = env!("CARGO_PKG_VERSION");
-    let metrics_text = format!(
-        r#"# HELP fks_build_info Build information for the service
-# TYPE fks_build_info gauge
-fks_build_info{{service="fks_execution",version="{}"}} 1
-"#,
-        version
-    );
-    (StatusCode::OK, [("content-type", "text/plain; version=0.0.4; charset=utf-8")], metrics_text)
+    (StatusCode::OK, [("content-type", "text/plain; version=0.0.4; charset=utf-8")], METRICS_BODY)
 }
@@ -1,4 +1,4 @@
-use axum::{routing::{get, post}, Router, Json, extract::{State, Path, Query}, http::StatusCode};
+use axum::{routing::{get, post}, Router, Json, extract::{DefaultBodyLimit, State, Path, Query}, http::StatusCode, serve::ListenerExt};
 use clap::Parser;
 use serde::Serialize;
 use std::{net::SocketAddr, time::{Instant, Duration}, sync::Arc};
@@ -8,6 +8,7 @@ use serde::Deserialize;
 // Plugin framework
 mod plugins;
 mod health;
+mod order_queue;
 use plugins::{
     registry::PluginRegistry, 
     ccxt::CCXTPlugin,
@@ -16,6 +17,11 @@ use plugins::{
     Order, OrderSide, OrderType,
     ExecutionPlugin
 };
+use order_queue::{Enqueued, OrderQueue};
+
+/// Upper bound on TradingView webhook bodies. Alerts are a few hundred bytes,
+/// so anything larger is rejected with 413 before it is buffered or parsed.
+const WEBHOOK_BODY_LIMIT: usize = 16 * 1024;
 
 #[derive(Parser, Debug)]
 #[command(version, about="FKS Execution API")] 
@@ -28,12 +34,12 @@ struct Cli {
 
 #[derive(Deserialize)] struct SignalRequest { symbol: Option<String>, prices: Option<Vec<f64>> }
 
-#[derive(Serialize)] struct Health { service: String, status: String }
 
 #[derive(Clone)]
 struct AppState { 
-    start: Instant,
-    registry: Arc<PluginRegistry>
+    registry: Arc<PluginRegistry>,
+    /// Set when webhooks are acknowledged before execution (WEBHOOK_ASYNC_EXECUTION)
+    order_queue: Option<OrderQueue>,
 }
 
 #[derive(Deserialize)]
@@ -48,11 +54,52 @@ struct TradingViewWebhook {
     confidence: Option<f64>,
 }
 
+impl TradingViewWebhook {
+    /// Validate the alert once and move its fields into an Order
+    fn into_order(self) -> Result<Order, String> {
+        // Convert TradingView action to OrderSide
+        let side = OrderSide::parse(&self.action)
+            .ok_or_else(|| format!("Invalid action: {}", self.action))?;
+        
+        // Convert order type (TradingView alerts default to market)
+        let order_type = self.order_type.as_deref()
+            .and_then(OrderType::parse)
+            .unwrap_or(OrderType::Market);
+        
+        let order = Order {
+            symbol: self.symbol,
+            side,
+            order_type,
+            quantity: self.quantity,
+            price: self.price,
+            stop_loss: self.stop_loss,
+            take_profit: self.take_profit,
+            confidence: self.confidence.unwrap_or(0.7),
+        };
+        order.validate().map_err(|e| e.to_string())?;
+        Ok(order)
+    }
+}
+
 #[derive(Serialize)]
 struct WebhookResponse {
     success: bool,
     order_id: Option<String>,
     error: Option<String>,
+    #[serde(skip_serializing_if = "Option::is_none")]
+    message: Option<&'static str>,
+}
+
+impl WebhookResponse {
+    /// Build a success response, optionally noting how the signal was handled
+    fn accepted(status: StatusCode, order_id: Option<String>, message: Option<&'static str>) -> (StatusCode, Json<WebhookResponse>) {
+        (status, Json(WebhookResponse { success: true, order_id, error: None, message }))
+    }
+    
+    /// Build an error response for a rejected or failed webhook
+    fn rejected(status: StatusCode, error: Option<String>) -> (StatusCode, Json<WebhookResponse>) {
+        (status, Json(WebhookResponse { success: false, order_id: None, error, message: None }))
+    }
 }
 
 /// Order creation request
@@ -81,6 +128,23 @@ struct CreateOrderResponse {
     timestamp: i64,
 }
 
+impl CreateOrderResponse {
+    /// Build an error response for a rejected or failed order request
+    fn rejected(status: StatusCode, error: String) -> (StatusCode, Json<CreateOrderResponse>) {
+        (
+            status,
+            Json(CreateOrderResponse {
+                success: false,
+                order_id: None,
+                filled_quantity: 0.0,
+                average_price: 0.0,
+                error: Some(error),
+                timestamp: plugins::now_millis(),
+            }),
+        )
+    }
+}
+
 /// Set leverage request
 #[derive(Deserialize)]
 struct SetLeverageRequest {
@@ -138,8 +202,12 @@ async fn main() -> anyhow::Result<()> {
     
     tracing::info!(listen = %cli.listen, "parsed_cli");
     
-    // Initialize plugin registry
-    let registry = Arc::new(PluginRegistry::new());
+    // Initialize plugin registry (ORDER_CONCURRENCY caps in-flight orders per plugin)
+    let order_concurrency = std::env::var("ORDER_CONCURRENCY")
+        .ok()
+        .and_then(|v| v.parse::<usize>().ok())
+        .unwrap_or(plugins::registry::DEFAULT_ORDER_CONCURRENCY);
+    let registry = Arc::new(PluginRegistry::with_order_concurrency(order_concurrency));
     
     // Initialize CCXT plugin (non-fatal - service can run without it)
     let mut ccxt = CCXTPlugin::new("binance");
@@ -225,9 +293,37 @@ async fn main() -> anyhow::Result<()> {
         tracing::info!("kucoin_api_credentials_not_configured_skipping_kucoin_plugin");
     }
     
+    // Optionally acknowledge webhooks immediately and execute orders in the background
+    let order_queue = if std::env::var("WEBHOOK_ASYNC_EXECUTION").unwrap_or_else(|_| "false".to_string()) == "true" {
+        let workers = std::env::var("ORDER_QUEUE_WORKERS")
+            .ok()
+            .and_then(|v| v.parse::<usize>().ok())
+            .unwrap_or(order_concurrency);
+        let dedupe_window = std::env::var("WEBHOOK_DEDUPE_WINDOW_MS")
+            .ok()
+            .and_then(|v| v.parse::<u64>().ok())
+            .map(Duration::from_millis)
+            .unwrap_or(order_queue::DEFAULT_DEDUPE_WINDOW);
+        tracing::info!(workers, dedupe_window_ms = dedupe_window.as_millis() as u64, "webhook_async_execution_enabled");
+        Some(OrderQueue::start(
+            registry.clone(),
+            order_queue::DEFAULT_QUEUE_CAPACITY,
+            workers,
+            dedupe_window,
+        ))
+    } else {
+        None
+    };
+    
+    // Optional runtime diagnostics: report how late the scheduler wakes a timer
+    if std::env::var("LOOP_LAG_MONITOR").unwrap_or_else(|_| "false".to_string()) == "true" {
+        tracing::info!("loop_lag_monitor_enabled");
+        tokio::spawn(loop_lag_monitor());
+    }
+    
     let state = AppState { 
-        start: Instant::now(),
-        registry: registry.clone()
+        registry: registry.clone(),
+        order_queue,
     };
     
     let signal_routes = Router::new()
@@ -235,7 +331,8 @@ async fn main() -> anyhow::Result<()> {
         .route("/execute/signal", post(post_signal_handler));
     
     let webhook_routes = Router::new()
-        .route("/webhook/tradingview", post(tradingview_webhook_handler));
+        .route("/webhook/tradingview", post(tradingview_webhook_handler))
+        .layer(DefaultBodyLimit::max(WEBHOOK_BODY_LIMIT));
     
     // Order execution API routes
     let order_routes = Router::new()
@@ -251,8 +348,16 @@ async fn main() -> anyhow::Result<()> {
         .with_state(Arc::new(state));
     let addr: SocketAddr = match cli.listen.parse() { Ok(a) => a, Err(e) => { tracing::error!(error=%e, "addr_parse_failed"); return Err(e.into()); } };
     tracing::info!(%addr, "binding_listener");
-    let listener = match tokio::net::TcpListener::bind(addr).await { Ok(l) => l, Err(e) => { tracing::error!(error=%e, "bind_failed"); return Err(e.into()); } };
+    let backlog = std::env::var("LISTEN_BACKLOG")
+        .ok()
+        .and_then(|v| v.parse::<u32>().ok())
+        .unwrap_or(DEFAULT_LISTEN_BACKLOG);
+    let listener = match bind_listener(addr, backlog) { Ok(l) => l, Err(e) => { tracing::error!(error=%e, "bind_failed"); return Err(e.into()); } };
     tracing::info!("listener_bound");
+    // Webhook responses are small single writes; don't let Nagle hold them back
+    let listener = listener.tap_io(|tcp| {
+        if let Err(e) = tcp.set_nodelay(true) { tracing::warn!(error=%e, "set_nodelay_failed"); }
+    });
     let server = axum::serve(listener, app);
     tracing::info!("server_future_created");
     tokio::select! {
@@ -271,6 +376,17 @@ async fn main() -> anyhow::Result<()> {
     }
 }
 
+/// Accept queue depth; tokio's `TcpListener::bind` uses 1024, which a burst of
+/// alert webhooks can overflow before the accept loop catches up
+const DEFAULT_LISTEN_BACKLOG: u32 = 2048;
+
+fn bind_listener(addr: SocketAddr, backlog: u32) -> std::io::Result<tokio::net::TcpListener> {
+    let socket = if addr.is_ipv4() { tokio::net::TcpSocket::new_v4()? } else { tokio::net::TcpSocket::new_v6()? };
+    socket.set_reuseaddr(true)?;
+    socket.bind(addr)?;
+    socket.listen(backlog)
+}
+
 async fn shutdown_signal() {
     let ctrl_c = async {
         signal::ctrl_c().await.expect("failed to install Ctrl+C handler");
@@ -287,6 +403,31 @@ async fn shutdown_signal() {
     tokio::select! { _ = ctrl_c => {}, _ = terminate => {} }
 }
 
+/// Sample scheduler lag every 100ms and report the worst delay once a minute.
+/// A blocked worker thread shows up here long before it shows up in order latency.
+async fn loop_lag_monitor() {
+    const TICK: Duration = Duration::from_millis(100);
+    const REPORT_EVERY: u32 = 600;
+    const WARN_LAG: Duration = Duration::from_millis(50);
+    let mut max_lag = Duration::ZERO;
+    let mut ticks = 0u32;
+    loop {
+        let before = Instant::now();
+        tokio::time::sleep(TICK).await;
+        let lag = before.elapsed().saturating_sub(TICK);
+        if lag > WARN_LAG {
+            tracing::warn!(lag_ms = lag.as_millis() as u64, "loop_lag_high");
+        }
+        max_lag = max_lag.max(lag);
+        ticks += 1;
+        if ticks == REPORT_EVERY {
+            tracing::info!(max_lag_ms = max_lag.as_millis() as u64, "loop_lag");
+            max_lag = Duration::ZERO;
+            ticks = 0;
+        }
+    }
+}
+
 async fn get_signal_handler() -> Json<Signal> {
     build_signal(None).await
 }
@@ -310,93 +451,48 @@ async fn build_signal(input: Option<(String, Vec<f64>)>) -> Json<Signal> {
     Json(Signal { symbol, rsi, ema, risk_allowance, latency_ms: start.elapsed().as_millis() })
 }
 
-async fn health_handler(State(state): State<Arc<AppState>>) -> Json<Health> {
-    let uptime = state.start.elapsed().as_secs();
-    
-    // Check all plugin health
-    let plugins_healthy = state.registry.health_check_all().await.iter().all(|(_, healthy)| *healthy);
-    let status = if plugins_healthy { "healthy" } else { "degraded" };
-    
-    Json(Health { 
-        service: format!("fks-execution|uptime={uptime}s|plugins={}", state.registry.list_plugins().await.len()), 
-        status: status.into() 
-    })
-}
-
 async fn tradingview_webhook_handler(
     State(state): State<Arc<AppState>>,
     Json(webhook): Json<TradingViewWebhook>
-) -> Result<Json<WebhookResponse>, (StatusCode, Json<WebhookResponse>)> {
-    tracing::info!(symbol = %webhook.symbol, action = %webhook.action, "webhook_received");
-    
-    // Convert TradingView action to OrderSide
-    let side = match webhook.action.to_lowercase().as_str() {
-        "buy" => OrderSide::Buy,
-        "sell" => OrderSide::Sell,
-        _ => {
-            return Err((
-                StatusCode::BAD_REQUEST,
-                Json(WebhookResponse {
-                    success: false,
-                    order_id: None,
-                    error: Some(format!("Invalid action: {}", webhook.action))
-                })
-            ));
-        }
-    };
+) -> Result<(StatusCode, Json<WebhookResponse>), (StatusCode, Json<WebhookResponse>)> {
+    tracing::debug!(symbol = %webhook.symbol, action = %webhook.action, "webhook_received");
     
-    // Convert order type
-    let order_type = match webhook.order_type.as_deref().unwrap_or("market") {
-        "market" => OrderType::Market,
-        "limit" => OrderType::Limit,
-        "stop" => OrderType::Stop,
-        "stop_limit" => OrderType::StopLimit,
-        _ => OrderType::Market,
+    let order = match webhook.into_order() {
+        Ok(order) => order,
+        Err(e) => return Err(WebhookResponse::rejected(StatusCode::BAD_REQUEST, Some(e))),
     };
     
-    // Create order
-    let order = Order {
-        symbol: webhook.symbol.clone(),
-        side,
-        order_type,
-        quantity: webhook.quantity,
-        price: webhook.price,
-        stop_loss: webhook.stop_loss,
-        take_profit: webhook.take_profit,
-        confidence: webhook.confidence.unwrap_or(0.7),
-    };
+    // Hand off to the background workers and acknowledge right away; a retried
+    // signal is still acknowledged so the sender stops retrying, but with 200
+    // and a message so it can be told apart from a newly queued order
+    if let Some(queue) = &state.order_queue {
+        return match queue.enqueue(order) {
+            Ok(Enqueued::Queued) => Ok(WebhookResponse::accepted(StatusCode::ACCEPTED, None, None)),
+            Ok(Enqueued::Duplicate) => Ok(WebhookResponse::accepted(
+                StatusCode::OK,
+                None,
+                Some("Duplicate signal ignored"),
+            )),
+            Err(e) => Err(WebhookResponse::rejected(StatusCode::SERVICE_UNAVAILABLE, Some(e))),
+        };
+    }
     
     // Execute order via plugin registry (use default plugin)
     match state.registry.execute_order(order, None).await {
         Ok(result) => {
             if result.success {
                 tracing::info!(order_id = ?result.order_id, filled = result.filled_quantity, "order_executed");
-                Ok(Json(WebhookResponse {
-                    success: true,
-                    order_id: result.order_id,
-                    error: None,
-                }))
+                Ok(WebhookResponse::accepted(StatusCode::OK, result.order_id, None))
             } else {
                 tracing::warn!(error = ?result.error, "order_failed");
-                Err((
-                    StatusCode::INTERNAL_SERVER_ERROR,
-                    Json(WebhookResponse {
-                        success: false,
-                        order_id: None,
-                        error: result.error,
-                    })
-                ))
+                Err(WebhookResponse::rejected(StatusCode::INTERNAL_SERVER_ERROR, result.error))
             }
         },
         Err(e) => {
             tracing::error!(error = %e, "order_execution_error");
-            Err((
+            Err(WebhookResponse::rejected(
                 StatusCode::INTERNAL_SERVER_ERROR,
-                Json(WebhookResponse {
-                    success: false,
-                    order_id: None,
-                    error: Some(format!("Execution error: {}", e))
-                })
+                Some(format!("Execution error: {}", e)),
             ))
         }
     }
@@ -407,7 +503,7 @@ async fn create_order_handler(
     State(state): State<Arc<AppState>>,
     Json(req): Json<CreateOrderRequest>
 ) -> Result<Json<CreateOrderResponse>, (StatusCode, Json<CreateOrderResponse>)> {
-    tracing::info!(
+    tracing::debug!(
         exchange = %req.exchange,
         symbol = %req.symbol,
         side = %req.side,
@@ -416,49 +512,23 @@ async fn create_order_handler(
     );
     
     // Convert side
-    let side = match req.side.to_lowercase().as_str() {
-        "buy" => OrderSide::Buy,
-        "sell" => OrderSide::Sell,
-        _ => {
-            return Err((
+    let side = match OrderSide::parse(&req.side) {
+        Some(side) => side,
+        None => {
+            return Err(CreateOrderResponse::rejected(
                 StatusCode::BAD_REQUEST,
-                Json(CreateOrderResponse {
-                    success: false,
-                    order_id: None,
-                    filled_quantity: 0.0,
-                    average_price: 0.0,
-                    error: Some(format!("Invalid side: {}", req.side)),
-                    timestamp: std::time::SystemTime::now()
-                        .duration_since(std::time::UNIX_EPOCH)
-                        .unwrap()
-                        .as_millis() as i64,
-                })
+                format!("Invalid side: {}", req.side),
             ));
         }
     };
     
     // Convert order type
-    let order_type = match req.order_type.to_lowercase().as_str() {
-        "market" => OrderType::Market,
-        "limit" => OrderType::Limit,
-        "stop" => OrderType::Stop,
-        "stop_limit" | "stoplimit" => OrderType::StopLimit,
-        "take_profit" | "takeprofit" => OrderType::TakeProfit,
-        "stop_loss" | "stoploss" => OrderType::StopLoss,
-        _ => {
-            return Err((
+    let order_type = match OrderType::parse(&req.order_type) {
+        Some(order_type) => order_type,
+        None => {
+            return Err(CreateOrderResponse::rejected(
                 StatusCode::BAD_REQUEST,
-                Json(CreateOrderResponse {
-                    success: false,
-                    order_id: None,
-                    filled_quantity: 0.0,
-                    average_price: 0.0,
-                    error: Some(format!("Invalid order_type: {}", req.order_type)),
-                    timestamp: std::time::SystemTime::now()
-                        .duration_since(std::time::UNIX_EPOCH)
-                        .unwrap()
-                        .as_millis() as i64,
-                })
+                format!("Invalid order_type: {}", req.order_type),
             ));
         }
     };
@@ -475,6 +545,10 @@ async fn create_order_handler(
         confidence: 0.7, // Default confidence
     };
     
+    if let Err(e) = order.validate() {
+        return Err(CreateOrderResponse::rejected(StatusCode::BAD_REQUEST, e.to_string()));
+    }
+    
     // Execute order via specified plugin
     match state.registry.execute_order(order, Some(&req.exchange)).await {
         Ok(result) => {
@@ -496,19 +570,9 @@ async fn create_order_handler(
         },
         Err(e) => {
             tracing::error!(exchange = %req.exchange, error = %e, "order_execution_error");
-            Err((
+            Err(CreateOrderResponse::rejected(
                 StatusCode::INTERNAL_SERVER_ERROR,
-                Json(CreateOrderResponse {
-                    success: false,
-                    order_id: None,
-                    filled_quantity: 0.0,
-                    average_price: 0.0,
-                    error: Some(format!("Execution error: {}", e)),
-                    timestamp: std::time::SystemTime::now()
-                        .duration_since(std::time::UNIX_EPOCH)
-                        .unwrap()
-                        .as_millis() as i64,
-                })
+                format!("Execution error: {}", e),
             ))
         }
     }
@@ -520,7 +584,7 @@ async fn set_leverage_handler(
     Path(exchange): Path<String>,
     Json(req): Json<SetLeverageRequest>
 ) -> Result<Json<SetLeverageResponse>, (StatusCode, Json<SetLeverageResponse>)> {
-    tracing::info!(
+    tracing::debug!(
         exchange = %exchange,
         symbol = %req.symbol,
         leverage = %req.leverage,
@@ -577,7 +641,7 @@ async fn get_positions_handler(
     State(state): State<Arc<AppState>>,
     Query(params): Query<PositionQuery>
 ) -> Result<Json<PositionResponse>, (StatusCode, Json<serde_json::Value>)> {
-    tracing::info!(
+    tracing::debug!(
         exchange = %params.exchange,
         symbol = ?params.symbol,
         "get_positions_request"
@@ -604,3 +668,63 @@ async fn get_positions_handler(
         }))
     ))
 }
+
+#[cfg(test)]
+mod tests {
+    use super::*;
+    
+    fn webhook(json: serde_json::Value) -> TradingViewWebhook {
+        serde_json::from_value(json).unwrap()
+    }
+    
+    #[test]
+    fn test_into_order_parses_side_and_type_case_insensitively() {
+        let order = webhook(serde_json::json!({
+            "symbol": "BTCUSDT",
+            "action": "SELL",
+            "order_type": "Limit",
+            "quantity": 0.1,
+            "price": 67500.0
+        })).into_order().unwrap();
+        
+        assert_eq!(order.side, OrderSide::Sell);
+        assert_eq!(order.order_type, OrderType::Limit);
+        assert_eq!(order.price, Some(67500.0));
+    }
+    
+    #[test]
+    fn test_into_order_defaults_to_market() {
+        let order = webhook(serde_json::json!({
+            "symbol": "BTCUSDT",
+            "action": "buy",
+            "quantity": 0.1
+        })).into_order().unwrap();
+        
+        assert_eq!(order.side, OrderSide::Buy);
+        assert_eq!(order.order_type, OrderType::Market);
+        assert_eq!(order.confidence, 0.7);
+    }
+    
+    #[test]
+    fn test_into_order_rejects_invalid_action() {
+        let result = webhook(serde_json::json!({
+            "symbol": "BTCUSDT",
+            "action": "hold",
+            "quantity": 0.1
+        })).into_order();
+        
+        assert_eq!(result.unwrap_err(), "Invalid action: hold");
+    }
+    
+    #[test]
+    fn test_into_order_rejects_invalid_order() {
+        let result = webhook(serde_json::json!({
+            "symbol": "BTCUSDT",
+            "action": "buy",
+            "order_type": "limit",
+            "quantity": 0.1
+        })).into_order();
+        
+        assert_eq!(result.unwrap_err(), "Limit orders require a price");
+    }
+}
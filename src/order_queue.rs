@@ -0,0 +1,233 @@
+//! Background Order Queue
+//!
+//! Decouples webhook acknowledgement from exchange execution: handlers push a
+//! validated order onto a bounded channel and return immediately, while a
+//! small pool of worker tasks drains it through the plugin registry, taking
+//! bursts off the channel together and executing them in arrival order.
+//! Optionally, identical signals repeated within a short window (alert
+//! retries) are acknowledged but only executed once.
+
+use crate::plugins::{registry::PluginRegistry, Order};
+use std::collections::hash_map::DefaultHasher;
+use std::collections::HashMap;
+use std::hash::{Hash, Hasher};
+use std::sync::Arc;
+use std::time::{Duration, Instant};
+use tokio::sync::mpsc::{self, error::TrySendError};
+use tokio::sync::Mutex;
+
+/// Default number of orders that may wait in the queue
+pub const DEFAULT_QUEUE_CAPACITY: usize = 1024;
+
+/// Default window in which an identical signal is treated as a retry
+///
+/// Off: signals are matched on order contents, so two genuine identical
+/// orders (pyramiding, strategies alerting on the same bar) would be dropped.
+pub const DEFAULT_DEDUPE_WINDOW: Duration = Duration::ZERO;
+
+/// Most orders a worker takes off the queue in one go
+const BATCH_LIMIT: usize = 32;
+
+/// Upper bound on remembered signal fingerprints
+const DEDUPE_CAPACITY: usize = 4096;
+
+/// Outcome of handing an order to the queue
+#[derive(Debug, PartialEq)]
+pub enum Enqueued {
+    /// Accepted for execution
+    Queued,
+    /// Same signal seen within the dedupe window; acknowledged, not executed
+    Duplicate,
+}
+
+/// Handle for enqueueing orders to the background workers
+#[derive(Clone)]
+pub struct OrderQueue {
+    sender: mpsc::Sender<Order>,
+    dedupe_window: Duration,
+    recent: Arc<std::sync::Mutex<HashMap<u64, Instant>>>,
+}
+
+impl OrderQueue {
+    /// Create the queue and spawn `workers` consumer tasks
+    ///
+    /// Workers execute through the registry, so the per-plugin order
+    /// concurrency cap still applies to queued orders.
+    ///
+    /// A `dedupe_window` of zero disables duplicate suppression.
+    pub fn start(
+        registry: Arc<PluginRegistry>,
+        capacity: usize,
+        workers: usize,
+        dedupe_window: Duration,
+    ) -> Self {
+        let (sender, receiver) = mpsc::channel(capacity.max(1));
+        let receiver = Arc::new(Mutex::new(receiver));
+        
+        for worker in 0..workers.max(1) {
+            let registry = registry.clone();
+            let receiver = receiver.clone();
+            
+            tokio::spawn(async move {
+                let mut batch = Vec::with_capacity(BATCH_LIMIT);
+                loop {
+                    // Take everything already waiting in one lock acquisition
+                    let received = receiver.lock().await.recv_many(&mut batch, BATCH_LIMIT).await;
+                    if received == 0 {
+                        break;
+                    }
+                    
+                    // One at a time, in arrival order, so orders on a symbol
+                    // reach the exchange in the sequence they were sent
+                    for order in batch.drain(..) {
+                        Self::execute(&registry, worker, order).await;
+                    }
+                }
+                tracing::debug!(worker, "order_queue_worker_stopped");
+            });
+        }
+        
+        Self {
+            sender,
+            dedupe_window,
+            recent: Arc::new(std::sync::Mutex::new(HashMap::new())),
+        }
+    }
+    
+    /// Enqueue an order without waiting; fails fast when the queue is full
+    /// so the caller can shed load instead of holding the connection open
+    pub fn enqueue(&self, order: Order) -> Result<Enqueued, String> {
+        if self.dedupe_window.is_zero() {
+            return self.send(order).map(|()| Enqueued::Queued);
+        }
+        
+        let fingerprint = Self::fingerprint(&order);
+        let now = Instant::now();
+        
+        // Check, send and record under one lock: a retry racing the original
+        // must not be acknowledged as a duplicate of an order that then fails
+        // to queue. try_send never waits, so the lock is held only briefly.
+        let mut recent = self.recent.lock().unwrap();
+        if recent.get(&fingerprint).is_some_and(|seen| now.duration_since(*seen) < self.dedupe_window) {
+            tracing::info!(symbol = %order.symbol, "duplicate_signal_ignored");
+            return Ok(Enqueued::Duplicate);
+        }
+        
+        self.send(order)?;
+        
+        if recent.len() >= DEDUPE_CAPACITY {
+            recent.retain(|_, seen| now.duration_since(*seen) < self.dedupe_window);
+            if recent.len() >= DEDUPE_CAPACITY {
+                recent.clear();
+            }
+        }
+        recent.insert(fingerprint, now);
+        Ok(Enqueued::Queued)
+    }
+    
+    fn send(&self, order: Order) -> Result<(), String> {
+        self.sender.try_send(order).map_err(|e| match e {
+            TrySendError::Full(_) => "Order queue is full".to_string(),
+            TrySendError::Closed(_) => "Order queue is closed".to_string(),
+        })
+    }
+    
+    /// Identify a signal by its contents; retries carry the same fields
+    fn fingerprint(order: &Order) -> u64 {
+        let mut hasher = DefaultHasher::new();
+        order.symbol.hash(&mut hasher);
+        std::mem::discriminant(&order.side).hash(&mut hasher);
+        std::mem::discriminant(&order.order_type).hash(&mut hasher);
+        order.quantity.to_bits().hash(&mut hasher);
+        order.price.map(f64::to_bits).hash(&mut hasher);
+        order.stop_loss.map(f64::to_bits).hash(&mut hasher);
+        order.take_profit.map(f64::to_bits).hash(&mut hasher);
+        hasher.finish()
+    }
+    
+    async fn execute(registry: &PluginRegistry, worker: usize, order: Order) {
+        let symbol = order.symbol.clone();
+        
+        match registry.execute_order(order, None).await {
+            Ok(result) if result.success => {
+                tracing::info!(worker, symbol = %symbol, order_id = ?result.order_id, filled = result.filled_quantity, "queued_order_executed");
+            }
+            Ok(result) => {
+                tracing::warn!(worker, symbol = %symbol, error = ?result.error, "queued_order_failed");
+            }
+            Err(e) => {
+                tracing::error!(worker, symbol = %symbol, error = %e, "queued_order_execution_error");
+            }
+        }
+    }
+}
+
+#[cfg(test)]
+mod tests {
+    use super::*;
+    use crate::plugins::mock::MockPlugin;
+    use crate::plugins::{ExecutionPlugin, OrderSide, OrderType};
+    
+    const TEST_DEDUPE_WINDOW: Duration = Duration::from_secs(5);
+    
+    #[tokio::test]
+    async fn test_order_queue_accepts_orders() {
+        let registry = Arc::new(PluginRegistry::new());
+        
+        let mut mock_plugin = MockPlugin::new("mock1");
+        mock_plugin.init(serde_json::json!({})).await.unwrap();
+        registry.register("mock1".to_string(), Arc::new(mock_plugin)).await;
+        
+        let queue = OrderQueue::start(registry, 4, 2, Duration::ZERO);
+        
+        let order = test_order(0.1);
+        
+        assert_eq!(queue.enqueue(order.clone()), Ok(Enqueued::Queued));
+        assert_eq!(queue.enqueue(order), Ok(Enqueued::Queued));
+    }
+    
+    #[tokio::test]
+    async fn test_order_queue_ignores_retried_signal() {
+        let registry = Arc::new(PluginRegistry::new());
+        
+        let mut mock_plugin = MockPlugin::new("mock1");
+        mock_plugin.init(serde_json::json!({})).await.unwrap();
+        registry.register("mock1".to_string(), Arc::new(mock_plugin)).await;
+        
+        let queue = OrderQueue::start(registry, 4, 1, TEST_DEDUPE_WINDOW);
+        
+        assert_eq!(queue.enqueue(test_order(0.1)), Ok(Enqueued::Queued));
+        assert_eq!(queue.enqueue(test_order(0.1)), Ok(Enqueued::Duplicate));
+        assert_eq!(queue.enqueue(test_order(0.2)), Ok(Enqueued::Queued));
+    }
+    
+    #[tokio::test]
+    async fn test_order_queue_rejects_when_full() {
+        // One slot and no workers draining it
+        let (sender, _receiver) = mpsc::channel(1);
+        let queue = OrderQueue {
+            sender,
+            dedupe_window: TEST_DEDUPE_WINDOW,
+            recent: Arc::new(std::sync::Mutex::new(HashMap::new())),
+        };
+        
+        assert_eq!(queue.enqueue(test_order(0.1)), Ok(Enqueued::Queued));
+        assert_eq!(queue.enqueue(test_order(0.2)), Err("Order queue is full".to_string()));
+        // A rejected signal is not remembered, so its retry is not swallowed as a duplicate
+        assert_eq!(queue.enqueue(test_order(0.2)), Err("Order queue is full".to_string()));
+        assert!(!queue.recent.lock().unwrap().contains_key(&OrderQueue::fingerprint(&test_order(0.2))));
+    }
+    
+    fn test_order(quantity: f64) -> Order {
+        Order {
+            symbol: "BTC/USDT".to_string(),
+            side: OrderSide::Buy,
+            order_type: OrderType::Market,
+            quantity,
+            price: Some(67500.0),
+            stop_loss: None,
+            take_profit: None,
+            confidence: 0.75,
+        }
+    }
+}
@@ -3,13 +3,13 @@
 //! Direct integration with Bybit API for futures trading (linear contracts).
 //! Supports order placement, leverage management, and position queries.
 
-use super::{ExecutionPlugin, ExecutionResult, MarketData, Order, OrderSide, OrderType};
+use super::cache::MarketDataCache;
+use super::{keyed_signer, now_millis, sign, ExecutionPlugin, ExecutionResult, HmacSha256, MarketData, Order, OrderSide, OrderType};
 use async_trait::async_trait;
 use reqwest::Client;
 use serde::Deserialize;
 use std::error::Error;
 use std::sync::Arc;
-use std::time::{SystemTime, UNIX_EPOCH};
 use tokio::sync::RwLock;
 
 /// Configuration for Bybit plugin
@@ -101,6 +101,10 @@ pub struct BybitPlugin {
     config: Arc<RwLock<Option<BybitConfig>>>,
     client: Client,
     base_url: String,
+    /// Short-TTL ticker snapshots shared by concurrent market-order fills
+    market_data: MarketDataCache,
+    /// HMAC state keyed with the API secret, built once in `init`
+    signer: Option<HmacSha256>,
 }
 
 impl BybitPlugin {
@@ -108,10 +112,9 @@ impl BybitPlugin {
         Self {
             name: name.to_string(),
             config: Arc::new(RwLock::new(None)),
-            client: Client::builder()
-                .timeout(std::time::Duration::from_secs(30))
-                .build()
-                .expect("Failed to create HTTP client"),
+            client: super::http_client(),
+            market_data: MarketDataCache::default(),
+            signer: None,
             base_url: "https://api.bybit.com".to_string(),
         }
     }
@@ -125,36 +128,19 @@ impl BybitPlugin {
         }
     }
     
-    /// Generate HMAC-SHA256 signature for Bybit API
-    fn generate_signature(secret: &str, message: &str) -> String {
-        use hmac::{Hmac, Mac};
-        use sha2::Sha256;
-        
-        type HmacSha256 = Hmac<Sha256>;
-        
-        let mut mac = HmacSha256::new_from_slice(secret.as_bytes())
-            .expect("HMAC can take key of any size");
-        mac.update(message.as_bytes());
-        let result = mac.finalize();
-        hex::encode(result.into_bytes())
-    }
-    
     /// Create authenticated request headers for POST requests (JSON body)
     async fn create_headers_post(
         &self,
         api_key: &str,
-        api_secret: &str,
+        signer: &HmacSha256,
         recv_window: u64,
         json_body: &str,
     ) -> Result<reqwest::header::HeaderMap, Box<dyn Error + Send + Sync>> {
-        let timestamp = SystemTime::now()
-            .duration_since(UNIX_EPOCH)
-            .unwrap()
-            .as_millis() as u64;
+        let timestamp = now_millis();
         
         // For POST: timestamp + api_key + recv_window + json_body
         let message = format!("{}{}{}{}", timestamp, api_key, recv_window, json_body);
-        let signature = Self::generate_signature(api_secret, &message);
+        let signature = hex::encode(sign(signer, &message));
         
         let mut headers = reqwest::header::HeaderMap::new();
         headers.insert("X-BAPI-API-KEY", api_key.parse()?);
@@ -171,18 +157,15 @@ impl BybitPlugin {
     async fn create_headers_get(
         &self,
         api_key: &str,
-        api_secret: &str,
+        signer: &HmacSha256,
         recv_window: u64,
         query_string: &str,
     ) -> Result<reqwest::header::HeaderMap, Box<dyn Error + Send + Sync>> {
-        let timestamp = SystemTime::now()
-            .duration_since(UNIX_EPOCH)
-            .unwrap()
-            .as_millis() as u64;
+        let timestamp = now_millis();
         
         // For GET: timestamp + api_key + recv_window + query_string
         let message = format!("{}{}{}{}", timestamp, api_key, recv_window, query_string);
-        let signature = Self::generate_signature(api_secret, &message);
+        let signature = hex::encode(sign(signer, &message));
         
         let mut headers = reqwest::header::HeaderMap::new();
         headers.insert("X-BAPI-API-KEY", api_key.parse()?);
@@ -218,7 +201,7 @@ impl BybitPlugin {
         let json_body = serde_json::to_string(&params)?;
         let headers = self.create_headers_post(
             &config.api_key,
-            &config.api_secret,
+            self.signer.as_ref().ok_or("Plugin not initialized")?,
             5000,
             &json_body,
         ).await?;
@@ -226,18 +209,18 @@ impl BybitPlugin {
         let response = self.client
             .post(&endpoint)
             .headers(headers)
-            .json(&params)
+            .body(json_body)
             .send()
             .await?;
         
         let status = response.status();
-        let text = response.text().await?;
+        let raw = response.bytes().await?;
         
         if !status.is_success() {
-            return Err(format!("Bybit API error ({}): {}", status, text).into());
+            return Err(format!("Bybit API error ({}): {}", status, String::from_utf8_lossy(&raw)).into());
         }
         
-        let bybit_resp: BybitResponse<serde_json::Value> = serde_json::from_str(&text)?;
+        let bybit_resp: BybitResponse<serde_json::Value> = serde_json::from_slice(&raw)?;
         
         if !bybit_resp.is_success() {
             return Err(format!("Bybit API error: {} - {}", bybit_resp.ret_code(), bybit_resp.ret_msg()).into());
@@ -267,7 +250,7 @@ impl BybitPlugin {
         let query_string = serde_qs::to_string(&params)?;
         let headers = self.create_headers_get(
             &config.api_key,
-            &config.api_secret,
+            self.signer.as_ref().ok_or("Plugin not initialized")?,
             5000,
             &query_string,
         ).await?;
@@ -280,13 +263,13 @@ impl BybitPlugin {
             .await?;
         
         let status = response.status();
-        let text = response.text().await?;
+        let raw = response.bytes().await?;
         
         if !status.is_success() {
-            return Err(format!("Bybit API error ({}): {}", status, text).into());
+            return Err(format!("Bybit API error ({}): {}", status, String::from_utf8_lossy(&raw)).into());
         }
         
-        let bybit_resp: BybitResponse<BybitPositionResult> = serde_json::from_str(&text)?;
+        let bybit_resp: BybitResponse<BybitPositionResult> = serde_json::from_slice(&raw)?;
         
         if !bybit_resp.is_success() {
             return Err(format!("Bybit API error: {} - {}", bybit_resp.ret_code(), bybit_resp.ret_msg()).into());
@@ -302,6 +285,80 @@ impl BybitPlugin {
         
         Ok(None)
     }
+    
+    /// Fetch a ticker snapshot straight from the exchange, bypassing the cache
+    async fn fetch_ticker(&self, symbol: &str) -> Result<MarketData, Box<dyn Error + Send + Sync>> {
+        let config = self.config.read().await;
+        let config = config.as_ref()
+            .ok_or("Plugin not initialized")?;
+        
+        let base_url = self.get_base_url(config.testnet);
+        let endpoint = format!("{}/v5/market/tickers", base_url);
+        
+        let params = serde_json::json!({
+            "category": config.category,
+            "symbol": symbol,
+        });
+        
+        // Public endpoint, no authentication required
+        let response = self.client
+            .get(&endpoint)
+            .query(&params)
+            .send()
+            .await?;
+        
+        let status = response.status();
+        let raw = response.bytes().await?;
+        
+        if !status.is_success() {
+            return Err(format!("Bybit API error ({}): {}", status, String::from_utf8_lossy(&raw)).into());
+        }
+        
+        #[derive(Deserialize)]
+        struct TickerResult {
+            list: Option<Vec<Ticker>>,
+        }
+        
+        #[derive(Deserialize)]
+        struct Ticker {
+            last_price: String,
+            bid1_price: String,
+            ask1_price: String,
+            volume24h: Option<String>,
+        }
+        
+        let bybit_resp: BybitResponse<TickerResult> = serde_json::from_slice(&raw)?;
+        
+        if !bybit_resp.is_success() {
+            return Err(format!("Bybit API error: {} - {}", bybit_resp.ret_code(), bybit_resp.ret_msg()).into());
+        }
+        
+        if let Some(result) = bybit_resp.result {
+            if let Some(list) = result.list {
+                if let Some(ticker) = list.first() {
+                    let last = ticker.last_price.parse::<f64>()?;
+                    let bid = ticker.bid1_price.parse::<f64>()?;
+                    let ask = ticker.ask1_price.parse::<f64>()?;
+                    let volume = ticker.volume24h
+                        .as_ref()
+                        .and_then(|v| v.parse::<f64>().ok())
+                        .unwrap_or(0.0);
+                    
+                    return Ok(MarketData {
+                        symbol: symbol.to_string(),
+                        bid,
+                        ask,
+                        last,
+                        volume,
+                        timestamp: now_millis(),
+                        extra: serde_json::json!({}),
+                    });
+                }
+            }
+        }
+        
+        Err(format!("No market data found for symbol: {}", symbol).into())
+    }
 }
 
 #[async_trait]
@@ -327,6 +384,7 @@ impl ExecutionPlugin for BybitPlugin {
         // Test connection with a simple API call (non-blocking, log warning if fails)
         // We'll do this on first order execution
         
+        self.signer = Some(keyed_signer(&bybit_config.api_secret));
         *self.config.write().await = Some(bybit_config);
         
         tracing::info!(plugin = %self.name, "Bybit plugin initialized successfully");
@@ -394,49 +452,41 @@ impl ExecutionPlugin for BybitPlugin {
         let json_body = serde_json::to_string(&params)?;
         let headers = self.create_headers_post(
             &config.api_key,
-            &config.api_secret,
+            self.signer.as_ref().ok_or("Plugin not initialized")?,
             5000,
             &json_body,
         ).await?;
         
-        let response = self.client
-            .post(&endpoint)
-            .headers(headers)
-            .json(&params)
-            .send()
-            .await?;
+        let send_order = async {
+            let response = self.client
+                .post(&endpoint)
+                .headers(headers)
+                .body(json_body)
+                .send()
+                .await?;
+            let status = response.status();
+            let raw = response.bytes().await?;
+            Ok::<_, Box<dyn Error + Send + Sync>>((status, raw))
+        };
         
-        let status = response.status();
-        let text = response.text().await?;
+        // Market orders are priced from the ticker; fetch it while the order is in flight
+        let (sent, market_price) = match order.order_type {
+            OrderType::Market => {
+                let (sent, market_data) = tokio::join!(send_order, self.fetch_data(&order.symbol));
+                (sent, market_data.ok().map(|data| data.last))
+            }
+            _ => (send_order.await, None),
+        };
+        let (status, raw) = sent?;
         
         if !status.is_success() {
-            return Ok(ExecutionResult {
-                success: false,
-                order_id: None,
-                filled_quantity: 0.0,
-                average_price: 0.0,
-                error: Some(format!("HTTP {}: {}", status, text)),
-                timestamp: SystemTime::now()
-                    .duration_since(UNIX_EPOCH)
-                    .unwrap()
-                    .as_millis() as i64,
-            });
+            return Ok(ExecutionResult::failed(Some(format!("HTTP {}: {}", status, String::from_utf8_lossy(&raw)))));
         }
         
-        let bybit_resp: BybitResponse<BybitOrderResult> = serde_json::from_str(&text)?;
+        let bybit_resp: BybitResponse<BybitOrderResult> = serde_json::from_slice(&raw)?;
         
         if !bybit_resp.is_success() {
-            return Ok(ExecutionResult {
-                success: false,
-                order_id: None,
-                filled_quantity: 0.0,
-                average_price: 0.0,
-                error: Some(format!("Bybit API error: {} - {}", bybit_resp.ret_code(), bybit_resp.ret_msg())),
-                timestamp: SystemTime::now()
-                    .duration_since(UNIX_EPOCH)
-                    .unwrap()
-                    .as_millis() as i64,
-            });
+            return Ok(ExecutionResult::failed(Some(format!("Bybit API error: {} - {}", bybit_resp.ret_code(), bybit_resp.ret_msg()))));
         }
         
         // Extract order ID from result
@@ -459,16 +509,9 @@ impl ExecutionPlugin for BybitPlugin {
             _ => 0.0,
         };
         
-        // Get current market price as average_price (for market orders)
+        // Market orders are priced at the ticker fetched alongside the order
         let average_price = match order.order_type {
-            OrderType::Market => {
-                // Try to fetch current price
-                if let Ok(market_data) = self.fetch_data(&order.symbol).await {
-                    market_data.last
-                } else {
-                    order.price.unwrap_or(0.0)
-                }
-            },
+            OrderType::Market => market_price.or(order.price).unwrap_or(0.0),
             _ => order.price.unwrap_or(0.0),
         };
         
@@ -478,87 +521,12 @@ impl ExecutionPlugin for BybitPlugin {
             filled_quantity,
             average_price,
             error: None,
-            timestamp: SystemTime::now()
-                .duration_since(UNIX_EPOCH)
-                .unwrap()
-                .as_millis() as i64,
+            timestamp: now_millis(),
         })
     }
     
     async fn fetch_data(&self, symbol: &str) -> Result<MarketData, Box<dyn Error + Send + Sync>> {
-        let config = self.config.read().await;
-        let config = config.as_ref()
-            .ok_or("Plugin not initialized")?;
-        
-        let base_url = self.get_base_url(config.testnet);
-        let endpoint = format!("{}/v5/market/tickers", base_url);
-        
-        let params = serde_json::json!({
-            "category": config.category,
-            "symbol": symbol,
-        });
-        
-        // Public endpoint, no authentication required
-        let response = self.client
-            .get(&endpoint)
-            .query(&params)
-            .send()
-            .await?;
-        
-        let status = response.status();
-        let text = response.text().await?;
-        
-        if !status.is_success() {
-            return Err(format!("Bybit API error ({}): {}", status, text).into());
-        }
-        
-        #[derive(Deserialize)]
-        struct TickerResult {
-            list: Option<Vec<Ticker>>,
-        }
-        
-        #[derive(Deserialize)]
-        struct Ticker {
-            last_price: String,
-            bid1_price: String,
-            ask1_price: String,
-            volume24h: Option<String>,
-        }
-        
-        let bybit_resp: BybitResponse<TickerResult> = serde_json::from_str(&text)?;
-        
-        if !bybit_resp.is_success() {
-            return Err(format!("Bybit API error: {} - {}", bybit_resp.ret_code(), bybit_resp.ret_msg()).into());
-        }
-        
-        if let Some(result) = bybit_resp.result {
-            if let Some(list) = result.list {
-                if let Some(ticker) = list.first() {
-                    let last = ticker.last_price.parse::<f64>()?;
-                    let bid = ticker.bid1_price.parse::<f64>()?;
-                    let ask = ticker.ask1_price.parse::<f64>()?;
-                    let volume = ticker.volume24h
-                        .as_ref()
-                        .and_then(|v| v.parse::<f64>().ok())
-                        .unwrap_or(0.0);
-                    
-                    return Ok(MarketData {
-                        symbol: symbol.to_string(),
-                        bid,
-                        ask,
-                        last,
-                        volume,
-                        timestamp: SystemTime::now()
-                            .duration_since(UNIX_EPOCH)
-                            .unwrap()
-                            .as_millis() as i64,
-                        extra: serde_json::json!({}),
-                    });
-                }
-            }
-        }
-        
-        Err(format!("No market data found for symbol: {}", symbol).into())
+        self.market_data.get_or_fetch(symbol, || self.fetch_ticker(symbol)).await
     }
     
     fn name(&self) -> &str {
@@ -568,14 +536,16 @@ impl ExecutionPlugin for BybitPlugin {
     async fn health_check(&self) -> Result<bool, Box<dyn Error + Send + Sync>> {
         // Check if plugin is initialized
         let config = self.config.read().await;
-        if config.is_none() {
-            return Ok(false);
-        }
+        let config = match config.as_ref() {
+            Some(c) => c,
+            None => return Ok(false),
+        };
         
-        // Try to fetch market data as a health check (public endpoint)
-        // This verifies connectivity to Bybit API
-        match self.fetch_data("BTCUSDT").await {
-            Ok(_) => Ok(true),
+        // Ping the server-time endpoint (public, tiny response) to verify
+        // connectivity to Bybit API without pulling a full ticker
+        let endpoint = format!("{}/v5/market/time", self.get_base_url(config.testnet));
+        match self.client.get(&endpoint).send().await {
+            Ok(response) => Ok(response.status().is_success()),
             Err(_) => Ok(false), // Return false but don't error
         }
     }
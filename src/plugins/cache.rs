@@ -0,0 +1,180 @@
+//! Short-lived Market Data Cache
+//!
+//! Collapses bursts of ticker lookups for the same symbol into one exchange
+//! request: concurrent callers wait on a single in-flight fetch and reuse its
+//! snapshot until the TTL expires. Slots are dropped when a fetch fails and
+//! pruned once stale, so lookups for unknown symbols don't accumulate.
+
+use super::MarketData;
+use std::collections::HashMap;
+use std::error::Error;
+use std::future::Future;
+use std::sync::{Arc, Mutex};
+use std::time::{Duration, Instant};
+
+/// Default lifetime of a cached snapshot
+pub const DEFAULT_MARKET_DATA_TTL: Duration = Duration::from_millis(250);
+
+/// Per-symbol slot; the async lock is held while a fetch is in flight
+type Slot = Arc<tokio::sync::Mutex<Option<(Instant, MarketData)>>>;
+
+/// Per-symbol market data cache with request coalescing
+pub struct MarketDataCache {
+    ttl: Duration,
+    slots: Mutex<HashMap<String, Slot>>,
+}
+
+impl MarketDataCache {
+    pub fn new(ttl: Duration) -> Self {
+        Self {
+            ttl,
+            slots: Mutex::new(HashMap::new()),
+        }
+    }
+    
+    /// Return a fresh cached snapshot for `symbol`, or run `fetch` to refresh it
+    ///
+    /// Only one fetch per symbol runs at a time; callers arriving meanwhile
+    /// wait for it and then read the snapshot it stored.
+    pub async fn get_or_fetch<F, Fut>(
+        &self,
+        symbol: &str,
+        fetch: F,
+    ) -> Result<MarketData, Box<dyn Error + Send + Sync>>
+    where
+        F: FnOnce() -> Fut,
+        Fut: Future<Output = Result<MarketData, Box<dyn Error + Send + Sync>>>,
+    {
+        let slot = {
+            let mut slots = self.slots.lock().unwrap();
+            match slots.get(symbol) {
+                Some(slot) => slot.clone(),
+                None => {
+                    // Keep slots another caller holds or whose snapshot is still fresh
+                    slots.retain(|_, slot| Arc::strong_count(slot) > 1 || self.is_fresh(slot));
+                    slots.entry(symbol.to_string()).or_default().clone()
+                }
+            }
+        };
+        
+        let mut entry = slot.lock().await;
+        if let Some((fetched_at, data)) = entry.as_ref() {
+            if fetched_at.elapsed() < self.ttl {
+                return Ok(data.clone());
+            }
+        }
+        
+        match fetch().await {
+            Ok(data) => {
+                *entry = Some((Instant::now(), data.clone()));
+                Ok(data)
+            }
+            Err(e) => {
+                // Don't keep a slot for a symbol the exchange couldn't serve
+                let mut slots = self.slots.lock().unwrap();
+                if slots.get(symbol).is_some_and(|current| Arc::ptr_eq(current, &slot)) {
+                    slots.remove(symbol);
+                }
+                Err(e)
+            }
+        }
+    }
+    
+    /// Whether an idle slot still holds a snapshot younger than the TTL
+    fn is_fresh(&self, slot: &Slot) -> bool {
+        slot.try_lock().map_or(true, |entry| {
+            entry.as_ref().is_some_and(|(fetched_at, _)| fetched_at.elapsed() < self.ttl)
+        })
+    }
+}
+
+impl Default for MarketDataCache {
+    fn default() -> Self {
+        Self::new(DEFAULT_MARKET_DATA_TTL)
+    }
+}
+
+#[cfg(test)]
+mod tests {
+    use super::*;
+    use std::sync::atomic::{AtomicUsize, Ordering};
+    
+    fn snapshot(symbol: &str) -> MarketData {
+        MarketData {
+            symbol: symbol.to_string(),
+            bid: 99.0,
+            ask: 101.0,
+            last: 100.0,
+            volume: 0.0,
+            timestamp: 1699113600000,
+            extra: serde_json::Value::Null,
+        }
+    }
+    
+    #[tokio::test]
+    async fn test_cache_reuses_fresh_snapshot() {
+        let cache = MarketDataCache::new(Duration::from_secs(60));
+        let fetches = AtomicUsize::new(0);
+        
+        for _ in 0..3 {
+            let data = cache.get_or_fetch("BTCUSDT", || async {
+                fetches.fetch_add(1, Ordering::SeqCst);
+                Ok(snapshot("BTCUSDT"))
+            }).await.unwrap();
+            assert_eq!(data.last, 100.0);
+        }
+        
+        assert_eq!(fetches.load(Ordering::SeqCst), 1);
+    }
+    
+    #[tokio::test]
+    async fn test_cache_refetches_after_ttl() {
+        let cache = MarketDataCache::new(Duration::ZERO);
+        let fetches = AtomicUsize::new(0);
+        
+        for _ in 0..2 {
+            cache.get_or_fetch("BTCUSDT", || async {
+                fetches.fetch_add(1, Ordering::SeqCst);
+                Ok(snapshot("BTCUSDT"))
+            }).await.unwrap();
+        }
+        
+        assert_eq!(fetches.load(Ordering::SeqCst), 2);
+    }
+    
+    #[tokio::test]
+    async fn test_cache_does_not_store_errors() {
+        let cache = MarketDataCache::new(Duration::from_secs(60));
+        
+        let result = cache.get_or_fetch("BTCUSDT", || async {
+            Err("exchange unavailable".into())
+        }).await;
+        assert!(result.is_err());
+        
+        let data = cache.get_or_fetch("BTCUSDT", || async { Ok(snapshot("BTCUSDT")) }).await;
+        assert!(data.is_ok());
+    }
+    
+    #[tokio::test]
+    async fn test_cache_drops_slot_after_failed_fetch() {
+        let cache = MarketDataCache::new(Duration::from_secs(60));
+        
+        let result = cache.get_or_fetch("NOTASYMBOL", || async {
+            Err("unknown symbol".into())
+        }).await;
+        assert!(result.is_err());
+        assert!(cache.slots.lock().unwrap().is_empty());
+    }
+    
+    #[tokio::test]
+    async fn test_cache_prunes_stale_slots() {
+        let cache = MarketDataCache::new(Duration::ZERO);
+        
+        cache.get_or_fetch("BTCUSDT", || async { Ok(snapshot("BTCUSDT")) }).await.unwrap();
+        cache.get_or_fetch("ETHUSDT", || async { Ok(snapshot("ETHUSDT")) }).await.unwrap();
+        
+        let slots = cache.slots.lock().unwrap();
+        assert_eq!(slots.len(), 1);
+        assert!(slots.contains_key("ETHUSDT"));
+    }
+}
@@ -3,9 +3,8 @@
 //! Integrates with external CCXT services via HTTP API calls.
 //! The CCXT service should be running separately and accessible via HTTP.
 
-use super::{ExecutionPlugin, ExecutionResult, MarketData, Order, OrderSide, OrderType};
+use super::{keyed_signer, now_millis, sign, ExecutionPlugin, ExecutionResult, HmacSha256, MarketData, Order, OrderSide, OrderType};
 use async_trait::async_trait;
-use chrono::Utc;
 use reqwest::Client;
 use serde::{Deserialize, Serialize};
 use std::error::Error;
@@ -34,13 +33,13 @@ fn default_exchange() -> String {
     "binance".to_string()
 }
 
-/// TradingView webhook payload format
+/// TradingView webhook payload format, borrowing from the order it signs
 #[derive(Debug, Serialize)]
-struct WebhookPayload {
+struct WebhookPayload<'a> {
     timestamp: i64,
-    symbol: String,
-    action: String, // "buy" or "sell"
-    order_type: String,
+    symbol: &'a str,
+    action: &'static str, // "buy" or "sell"
+    order_type: &'static str,
     quantity: f64,
     price: Option<f64>,
     stop_loss: Option<f64>,
@@ -63,6 +62,8 @@ pub struct CCXTPlugin {
     name: String,
     config: Arc<RwLock<Option<CCXTConfig>>>,
     client: Client,
+    /// HMAC state keyed with the webhook secret, built once in `init`
+    signer: Option<HmacSha256>,
 }
 
 impl CCXTPlugin {
@@ -70,26 +71,10 @@ impl CCXTPlugin {
         Self {
             name: name.to_string(),
             config: Arc::new(RwLock::new(None)),
-            client: Client::builder()
-                .timeout(std::time::Duration::from_secs(30))
-                .build()
-                .expect("Failed to create HTTP client"),
+            client: super::http_client(),
+            signer: None,
         }
     }
-    
-    /// Generate HMAC-SHA256 signature for webhook
-    fn generate_signature(payload: &str, secret: &str) -> String {
-        use hmac::{Hmac, Mac};
-        use sha2::Sha256;
-        
-        type HmacSha256 = Hmac<Sha256>;
-        
-        let mut mac = HmacSha256::new_from_slice(secret.as_bytes())
-            .expect("HMAC can take key of any size");
-        mac.update(payload.as_bytes());
-        let result = mac.finalize();
-        hex::encode(result.into_bytes())
-    }
 }
 
 #[async_trait]
@@ -128,6 +113,7 @@ impl ExecutionPlugin for CCXTPlugin {
             }
         }
         
+        self.signer = Some(keyed_signer(&ccxt_config.webhook_secret));
         *self.config.write().await = Some(ccxt_config);
         
         tracing::info!(plugin = %self.name, "CCXT plugin initialized successfully");
@@ -141,6 +127,8 @@ impl ExecutionPlugin for CCXTPlugin {
         let config = self.config.read().await;
         let config = config.as_ref()
             .ok_or("Plugin not initialized")?;
+        let signer = self.signer.as_ref()
+            .ok_or("Plugin not initialized")?;
         
         // Convert Order to webhook payload
         let action = match order.side {
@@ -158,10 +146,10 @@ impl ExecutionPlugin for CCXTPlugin {
         };
         
         let payload = WebhookPayload {
-            timestamp: Utc::now().timestamp(),
-            symbol: order.symbol.clone(),
-            action: action.to_string(),
-            order_type: order_type_str.to_string(),
+            timestamp: now_millis() / 1000,
+            symbol: &order.symbol,
+            action,
+            order_type: order_type_str,
             quantity: order.quantity,
             price: order.price,
             stop_loss: order.stop_loss,
@@ -170,9 +158,9 @@ impl ExecutionPlugin for CCXTPlugin {
         };
         
         let payload_json = serde_json::to_string(&payload)?;
-        let signature = Self::generate_signature(&payload_json, &config.webhook_secret);
+        let signature = hex::encode(sign(signer, &payload_json));
         
-        tracing::info!(
+        tracing::debug!(
             plugin = %self.name,
             symbol = %order.symbol,
             side = ?order.side,
@@ -202,7 +190,7 @@ impl ExecutionPlugin for CCXTPlugin {
             filled_quantity: webhook_response.filled_quantity.unwrap_or(0.0),
             average_price: webhook_response.average_price.unwrap_or(0.0),
             error: if !success { webhook_response.message } else { None },
-            timestamp: Utc::now().timestamp_millis(),
+            timestamp: now_millis(),
         })
     }
     
@@ -237,7 +225,7 @@ impl ExecutionPlugin for CCXTPlugin {
             ask: ticker.ask.unwrap_or(ticker.last * 1.0001),
             last: ticker.last,
             volume: ticker.volume.unwrap_or(0.0),
-            timestamp: ticker.timestamp.unwrap_or_else(|| Utc::now().timestamp_millis()),
+            timestamp: ticker.timestamp.unwrap_or_else(now_millis),
             extra: serde_json::json!({
                 "exchange": config.exchange,
                 "testnet": config.testnet
@@ -273,10 +261,10 @@ mod tests {
     #[test]
     fn test_signature_generation() {
         let payload = r#"{"timestamp":1699113600,"symbol":"BTC/USDT","action":"buy"}"#;
-        let secret = "test-secret";
+        let signer = keyed_signer("test-secret");
         
-        let sig1 = CCXTPlugin::generate_signature(payload, secret);
-        let sig2 = CCXTPlugin::generate_signature(payload, secret);
+        let sig1 = hex::encode(sign(&signer, payload));
+        let sig2 = hex::encode(sign(&signer, payload));
         
         // Same payload + secret should produce same signature
         assert_eq!(sig1, sig2);
@@ -307,9 +295,9 @@ mod tests {
     fn test_webhook_payload_serialization() {
         let payload = WebhookPayload {
             timestamp: 1699113600,
-            symbol: "BTC/USDT".to_string(),
-            action: "buy".to_string(),
-            order_type: "market".to_string(),
+            symbol: "BTC/USDT",
+            action: "buy",
+            order_type: "market",
             quantity: 0.1,
             price: Some(67500.0),
             stop_loss: Some(67000.0),
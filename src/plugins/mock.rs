@@ -2,9 +2,8 @@
 //!
 //! Simulates order execution without real broker/exchange connections
 
-use super::{ExecutionPlugin, ExecutionResult, MarketData, Order};
+use super::{now_millis, ExecutionPlugin, ExecutionResult, MarketData, Order};
 use async_trait::async_trait;
-use chrono::Utc;
 use std::error::Error;
 
 /// Mock plugin for testing and development
@@ -38,7 +37,7 @@ impl ExecutionPlugin for MockPlugin {
             return Err("Plugin not initialized".into());
         }
         
-        tracing::info!(
+        tracing::debug!(
             plugin = %self.name,
             symbol = %order.symbol,
             side = ?order.side,
@@ -63,7 +62,7 @@ impl ExecutionPlugin for MockPlugin {
             filled_quantity: order.quantity,
             average_price: execution_price,
             error: None,
-            timestamp: Utc::now().timestamp_millis(),
+            timestamp: now_millis(),
         })
     }
     
@@ -89,7 +88,7 @@ impl ExecutionPlugin for MockPlugin {
             ask: base_price + spread / 2.0,
             last: base_price,
             volume: 1000000.0,
-            timestamp: Utc::now().timestamp_millis(),
+            timestamp: now_millis(),
             extra: serde_json::json!({"source": "mock"}),
         })
     }
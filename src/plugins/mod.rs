@@ -3,6 +3,7 @@
 //! Defines the plugin interface for modular execution backends (NinjaTrader, MT5, CCXT, etc.)
 
 pub mod bybit;
+pub mod cache;
 pub mod ccxt;
 pub mod kucoin;
 pub mod mock;
@@ -10,8 +11,13 @@ pub mod openalgo;
 pub mod registry;
 
 use async_trait::async_trait;
+use hmac::{Hmac, Mac};
 use serde::{Deserialize, Serialize};
+use sha2::Sha256;
 use std::error::Error;
+use std::sync::OnceLock;
+use std::time::{Duration, SystemTime, UNIX_EPOCH};
+use thiserror::Error;
 
 /// Order side (buy or sell)
 #[derive(Debug, Clone, Serialize, Deserialize, PartialEq)]
@@ -21,6 +27,19 @@ pub enum OrderSide {
     Sell,
 }
 
+impl OrderSide {
+    /// Parse a side name case-insensitively ("buy"/"sell") without allocating
+    pub fn parse(s: &str) -> Option<Self> {
+        if s.eq_ignore_ascii_case("buy") {
+            Some(OrderSide::Buy)
+        } else if s.eq_ignore_ascii_case("sell") {
+            Some(OrderSide::Sell)
+        } else {
+            None
+        }
+    }
+}
+
 /// Order type
 #[derive(Debug, Clone, Serialize, Deserialize, PartialEq)]
 #[serde(rename_all = "lowercase")]
@@ -33,6 +52,30 @@ pub enum OrderType {
     StopLoss,
 }
 
+impl OrderType {
+    /// Parse an order type name case-insensitively, accepting both
+    /// snake_case and run-together spellings ("stop_limit"/"stoplimit")
+    pub fn parse(s: &str) -> Option<Self> {
+        let is = |names: &[&str]| names.iter().any(|name| s.eq_ignore_ascii_case(name));
+        
+        if is(&["market"]) {
+            Some(OrderType::Market)
+        } else if is(&["limit"]) {
+            Some(OrderType::Limit)
+        } else if is(&["stop"]) {
+            Some(OrderType::Stop)
+        } else if is(&["stop_limit", "stoplimit"]) {
+            Some(OrderType::StopLimit)
+        } else if is(&["take_profit", "takeprofit"]) {
+            Some(OrderType::TakeProfit)
+        } else if is(&["stop_loss", "stoploss"]) {
+            Some(OrderType::StopLoss)
+        } else {
+            None
+        }
+    }
+}
+
 /// Order structure for execution
 #[derive(Debug, Clone, Serialize, Deserialize)]
 pub struct Order {
@@ -62,6 +105,51 @@ pub struct Order {
     pub confidence: f64,
 }
 
+/// Why an order was rejected by `Order::validate`
+///
+/// Carries the offending value rather than a message, so rejections are
+/// only formatted when they are reported.
+#[derive(Debug, Clone, PartialEq, Error)]
+pub enum ValidationError {
+    #[error("Symbol is required")]
+    MissingSymbol,
+    
+    #[error("Quantity must be positive, got {0}")]
+    InvalidQuantity(f64),
+    
+    #[error("{0:?} orders require a price")]
+    MissingPrice(OrderType),
+    
+    #[error("Price must be positive, got {0}")]
+    InvalidPrice(f64),
+}
+
+impl Order {
+    /// Reject orders no venue would accept before spending a round-trip on them
+    pub fn validate(&self) -> Result<(), ValidationError> {
+        if self.symbol.is_empty() {
+            return Err(ValidationError::MissingSymbol);
+        }
+        
+        // NaN fails the comparison and infinity fails is_finite
+        if !(self.quantity > 0.0 && self.quantity.is_finite()) {
+            return Err(ValidationError::InvalidQuantity(self.quantity));
+        }
+        
+        match (&self.order_type, self.price) {
+            (OrderType::Limit | OrderType::StopLimit, None) => {
+                return Err(ValidationError::MissingPrice(self.order_type.clone()));
+            }
+            (_, Some(price)) if !(price > 0.0 && price.is_finite()) => {
+                return Err(ValidationError::InvalidPrice(price));
+            }
+            _ => {}
+        }
+        
+        Ok(())
+    }
+}
+
 fn default_confidence() -> f64 {
     0.6
 }
@@ -88,6 +176,20 @@ pub struct ExecutionResult {
     pub timestamp: i64,
 }
 
+impl ExecutionResult {
+    /// Result for an order the venue rejected or that could not be placed
+    pub fn failed(error: Option<String>) -> Self {
+        Self {
+            success: false,
+            order_id: None,
+            filled_quantity: 0.0,
+            average_price: 0.0,
+            error,
+            timestamp: now_millis(),
+        }
+    }
+}
+
 /// Market data snapshot
 #[derive(Debug, Clone, Serialize, Deserialize)]
 pub struct MarketData {
@@ -114,6 +216,58 @@ pub struct MarketData {
     pub extra: serde_json::Value,
 }
 
+/// Current Unix time in milliseconds, as used by exchange timestamps
+pub fn now_millis() -> i64 {
+    SystemTime::now()
+        .duration_since(UNIX_EPOCH)
+        .map_or(0, |elapsed| elapsed.as_millis() as i64)
+}
+
+/// HTTP client settings shared by the plugins: keep warm, pooled
+/// connections to each venue and fail fast when a host is unreachable
+pub fn http_client_builder() -> reqwest::ClientBuilder {
+    reqwest::Client::builder()
+        .connect_timeout(Duration::from_secs(5))
+        .pool_idle_timeout(Duration::from_secs(90))
+        .pool_max_idle_per_host(32)
+        .tcp_keepalive(Duration::from_secs(60))
+        .tcp_nodelay(true)
+}
+
+/// HMAC-SHA256 state used to sign venue requests
+pub type HmacSha256 = Hmac<Sha256>;
+
+/// Key an HMAC-SHA256 signer with an API secret
+///
+/// Keying runs the ipad/opad derivation, so plugins do it once in `init`
+/// and `sign` clones the keyed state per request.
+pub fn keyed_signer(secret: &str) -> HmacSha256 {
+    HmacSha256::new_from_slice(secret.as_bytes())
+        .expect("HMAC can take key of any size")
+}
+
+/// Raw HMAC-SHA256 digest of `message`; each venue picks its own encoding
+pub fn sign(signer: &HmacSha256, message: &str) -> hmac::digest::Output<HmacSha256> {
+    let mut mac = signer.clone();
+    mac.update(message.as_bytes());
+    mac.finalize().into_bytes()
+}
+
+static HTTP_CLIENT: OnceLock<reqwest::Client> = OnceLock::new();
+
+/// Process-wide HTTP client with a 30s request timeout. `Client` is a handle,
+/// so every plugin holding a clone shares one connection pool and DNS cache.
+pub fn http_client() -> reqwest::Client {
+    HTTP_CLIENT
+        .get_or_init(|| {
+            http_client_builder()
+                .timeout(Duration::from_secs(30))
+                .build()
+                .expect("Failed to create HTTP client")
+        })
+        .clone()
+}
+
 /// ExecutionPlugin trait - implemented by all execution backends
 #[async_trait]
 pub trait ExecutionPlugin: Send + Sync {
@@ -202,6 +356,81 @@ mod tests {
         assert_eq!(order.confidence, 0.6); // Default
     }
     
+    #[test]
+    fn test_order_validate() {
+        let order = Order {
+            symbol: "BTC/USDT".to_string(),
+            side: OrderSide::Buy,
+            order_type: OrderType::Limit,
+            quantity: 0.1,
+            price: Some(67500.0),
+            stop_loss: None,
+            take_profit: None,
+            confidence: 0.75,
+        };
+        assert!(order.validate().is_ok());
+        
+        let no_price = Order { price: None, ..order.clone() };
+        assert_eq!(no_price.validate(), Err(ValidationError::MissingPrice(OrderType::Limit)));
+        
+        let market = Order { order_type: OrderType::Market, ..no_price };
+        assert!(market.validate().is_ok());
+        
+        let zero_quantity = Order { quantity: 0.0, ..order.clone() };
+        assert_eq!(zero_quantity.validate(), Err(ValidationError::InvalidQuantity(0.0)));
+        
+        let nan_quantity = Order { quantity: f64::NAN, ..order.clone() };
+        assert!(nan_quantity.validate().is_err());
+        
+        let infinite_quantity = Order { quantity: f64::INFINITY, ..order.clone() };
+        assert!(infinite_quantity.validate().is_err());
+        
+        let infinite_price = Order { price: Some(f64::INFINITY), ..order.clone() };
+        assert!(infinite_price.validate().is_err());
+        
+        let no_symbol = Order { symbol: String::new(), ..order };
+        assert_eq!(no_symbol.validate(), Err(ValidationError::MissingSymbol));
+        assert_eq!(ValidationError::MissingSymbol.to_string(), "Symbol is required");
+    }
+    
+    #[test]
+    fn test_execution_result_failed() {
+        let result = ExecutionResult::failed(Some("rejected".to_string()));
+        assert!(!result.success);
+        assert_eq!(result.order_id, None);
+        assert_eq!(result.filled_quantity, 0.0);
+        assert_eq!(result.error.as_deref(), Some("rejected"));
+        assert!(result.timestamp > 0);
+    }
+    
+    #[test]
+    fn test_order_side_parse() {
+        assert_eq!(OrderSide::parse("buy"), Some(OrderSide::Buy));
+        assert_eq!(OrderSide::parse("SELL"), Some(OrderSide::Sell));
+        assert_eq!(OrderSide::parse("hold"), None);
+    }
+    
+    #[test]
+    fn test_order_type_parse() {
+        assert_eq!(OrderType::parse("market"), Some(OrderType::Market));
+        assert_eq!(OrderType::parse("Limit"), Some(OrderType::Limit));
+        assert_eq!(OrderType::parse("stoplimit"), Some(OrderType::StopLimit));
+        assert_eq!(OrderType::parse("TAKE_PROFIT"), Some(OrderType::TakeProfit));
+        assert_eq!(OrderType::parse("stop_loss"), Some(OrderType::StopLoss));
+        assert_eq!(OrderType::parse("iceberg"), None);
+    }
+    
+    #[test]
+    fn test_sign_matches_known_vector() {
+        // Well-known HMAC-SHA256 vector; the keyed signer must be reusable
+        let signer = keyed_signer("key");
+        let message = "The quick brown fox jumps over the lazy dog";
+        let expected = "f7bc83f430538424b13298e6aa6fb143ef4d59a14946175997479dbc2d1a3cd8";
+        
+        assert_eq!(hex::encode(sign(&signer, message)), expected);
+        assert_eq!(hex::encode(sign(&signer, message)), expected);
+    }
+    
     #[test]
     fn test_execution_result() {
         let result = ExecutionResult {
@@ -10,9 +10,8 @@
 //! - Real-time order status tracking
 //! - Position and balance management
 
-use super::{ExecutionPlugin, ExecutionResult, MarketData, Order, OrderSide, OrderType};
+use super::{now_millis, ExecutionPlugin, ExecutionResult, MarketData, Order, OrderSide, OrderType};
 use async_trait::async_trait;
-use chrono::Utc;
 use reqwest::Client;
 use serde::{Deserialize, Serialize};
 use std::error::Error;
@@ -51,15 +50,24 @@ impl Default for OpenAlgoConfig {
     }
 }
 
-/// OpenAlgo order request format
+/// Exchanges reachable through OpenAlgo
+const SUPPORTED_MARKETS: &[&str] = &[
+    "NSE",  // National Stock Exchange
+    "BSE",  // Bombay Stock Exchange
+    "NFO",  // NSE Futures & Options
+    "MCX",  // Multi Commodity Exchange
+    "CDS",  // Currency Derivatives
+];
+
+/// OpenAlgo order request format; the enumerated fields are static API codes
 #[derive(Debug, Serialize)]
 struct OpenAlgoOrderRequest {
     symbol: String,
-    exchange: String,
-    action: String,      // BUY or SELL
+    exchange: &'static str,
+    action: &'static str,      // BUY or SELL
     quantity: i32,
-    order_type: String,  // MARKET, LIMIT, SL, SL-M
-    product: String,     // CNC (delivery), MIS (intraday), NRML (F&O)
+    order_type: &'static str,  // MARKET, LIMIT, SL, SL-M
+    product: &'static str,     // CNC (delivery), MIS (intraday), NRML (F&O)
     price: Option<f64>,
     trigger_price: Option<f64>,
 }
@@ -101,45 +109,39 @@ impl OpenAlgoPlugin {
     
     /// Convert FKS symbol to NSE/BSE format
     /// e.g., "RELIANCE" -> "RELIANCE", "NIFTY50" -> "NIFTY 50"
-    fn convert_symbol(&self, symbol: &str) -> (String, String) {
-        // Default to NSE for most symbols
-        let exchange = if symbol.ends_with("-BSE") {
-            "BSE"
-        } else {
-            "NSE"
+    fn convert_symbol(&self, symbol: &str) -> (String, &'static str) {
+        // Default to NSE for most symbols; the suffix is stripped in place
+        let (base, exchange) = match symbol.strip_suffix("-BSE") {
+            Some(base) => (base, "BSE"),
+            None => (symbol.strip_suffix("-NSE").unwrap_or(symbol), "NSE"),
         };
         
-        let clean_symbol = symbol
-            .replace("-NSE", "")
-            .replace("-BSE", "")
-            .to_uppercase();
-        
-        (clean_symbol, exchange.to_string())
+        (base.to_uppercase(), exchange)
     }
     
     /// Convert FKS order type to OpenAlgo format
-    fn convert_order_type(&self, order_type: &OrderType) -> String {
+    fn convert_order_type(&self, order_type: &OrderType) -> &'static str {
         match order_type {
-            OrderType::Market => "MARKET".to_string(),
-            OrderType::Limit => "LIMIT".to_string(),
-            OrderType::Stop => "SL-M".to_string(),      // Stop-Loss Market
-            OrderType::StopLimit => "SL".to_string(),   // Stop-Loss Limit
-            OrderType::TakeProfit => "LIMIT".to_string(),
-            OrderType::StopLoss => "SL-M".to_string(),
+            OrderType::Market => "MARKET",
+            OrderType::Limit => "LIMIT",
+            OrderType::Stop => "SL-M",      // Stop-Loss Market
+            OrderType::StopLimit => "SL",   // Stop-Loss Limit
+            OrderType::TakeProfit => "LIMIT",
+            OrderType::StopLoss => "SL-M",
         }
     }
     
     /// Determine product type based on order context
-    fn get_product_type(&self, symbol: &str) -> String {
+    fn get_product_type(&self, symbol: &str) -> &'static str {
         // TODO: Make this configurable
         // CNC = Cash and Carry (delivery)
         // MIS = Margin Intraday Square-off
         // NRML = Normal (F&O)
         
         if symbol.contains("FUT") || symbol.contains("OPT") {
-            "NRML".to_string()
+            "NRML"
         } else {
-            "MIS".to_string() // Default to intraday for safety
+            "MIS" // Default to intraday for safety
         }
     }
 }
@@ -163,7 +165,7 @@ impl ExecutionPlugin for OpenAlgoPlugin {
         
         // Create HTTP client
         self.client = Some(
-            Client::builder()
+            super::http_client_builder()
                 .timeout(Duration::from_secs(self.config.timeout_secs))
                 .build()?
         );
@@ -210,7 +212,7 @@ impl ExecutionPlugin for OpenAlgoPlugin {
         let client = self.client.as_ref().ok_or("HTTP client not available")?;
         let (symbol, exchange) = self.convert_symbol(&order.symbol);
         
-        tracing::info!(
+        tracing::debug!(
             plugin = %self.name,
             symbol = %symbol,
             exchange = %exchange,
@@ -225,8 +227,8 @@ impl ExecutionPlugin for OpenAlgoPlugin {
             symbol,
             exchange,
             action: match order.side {
-                OrderSide::Buy => "BUY".to_string(),
-                OrderSide::Sell => "SELL".to_string(),
+                OrderSide::Buy => "BUY",
+                OrderSide::Sell => "SELL",
             },
             quantity: order.quantity as i32,
             order_type: self.convert_order_type(&order.order_type),
@@ -260,7 +262,7 @@ impl ExecutionPlugin for OpenAlgoPlugin {
                     filled_quantity: order.quantity,
                     average_price: order.price.unwrap_or(0.0),
                     error: None,
-                    timestamp: Utc::now().timestamp_millis(),
+                    timestamp: now_millis(),
                 })
             } else {
                 tracing::warn!(
@@ -269,14 +271,7 @@ impl ExecutionPlugin for OpenAlgoPlugin {
                     "Order rejected by OpenAlgo"
                 );
                 
-                Ok(ExecutionResult {
-                    success: false,
-                    order_id: None,
-                    filled_quantity: 0.0,
-                    average_price: 0.0,
-                    error: result.message,
-                    timestamp: Utc::now().timestamp_millis(),
-                })
+                Ok(ExecutionResult::failed(result.message))
             }
         } else {
             let status = response.status();
@@ -289,14 +284,7 @@ impl ExecutionPlugin for OpenAlgoPlugin {
                 "OpenAlgo API error"
             );
             
-            Ok(ExecutionResult {
-                success: false,
-                order_id: None,
-                filled_quantity: 0.0,
-                average_price: 0.0,
-                error: Some(format!("API error {}: {}", status, error_text)),
-                timestamp: Utc::now().timestamp_millis(),
-            })
+            Ok(ExecutionResult::failed(Some(format!("API error {}: {}", status, error_text))))
         }
     }
     
@@ -330,7 +318,7 @@ impl ExecutionPlugin for OpenAlgoPlugin {
                 ask,
                 last,
                 volume,
-                timestamp: Utc::now().timestamp_millis(),
+                timestamp: now_millis(),
                 extra: serde_json::json!({
                     "exchange": exchange,
                     "source": "openalgo",
@@ -351,7 +339,7 @@ impl ExecutionPlugin for OpenAlgoPlugin {
                 ask: 0.0,
                 last: 0.0,
                 volume: 0.0,
-                timestamp: Utc::now().timestamp_millis(),
+                timestamp: now_millis(),
                 extra: serde_json::json!({
                     "source": "openalgo",
                     "error": "quote_failed"
@@ -385,14 +373,8 @@ impl ExecutionPlugin for OpenAlgoPlugin {
 
 impl OpenAlgoPlugin {
     /// Get list of supported markets/exchanges
-    pub fn supported_markets(&self) -> Vec<String> {
-        vec![
-            "NSE".to_string(),  // National Stock Exchange
-            "BSE".to_string(),  // Bombay Stock Exchange
-            "NFO".to_string(),  // NSE Futures & Options
-            "MCX".to_string(),  // Multi Commodity Exchange
-            "CDS".to_string(),  // Currency Derivatives
-        ]
+    pub fn supported_markets(&self) -> &'static [&'static str] {
+        SUPPORTED_MARKETS
     }
 }
 
@@ -411,6 +393,10 @@ mod tests {
         let (symbol, exchange) = plugin.convert_symbol("INFY-BSE");
         assert_eq!(symbol, "INFY");
         assert_eq!(exchange, "BSE");
+        
+        let (symbol, exchange) = plugin.convert_symbol("tcs-NSE");
+        assert_eq!(symbol, "TCS");
+        assert_eq!(exchange, "NSE");
     }
     
     #[test]
@@ -5,20 +5,42 @@
 use super::{ExecutionPlugin, ExecutionResult, MarketData, Order};
 use std::collections::HashMap;
 use std::sync::Arc;
-use tokio::sync::RwLock;
+use tokio::sync::{RwLock, Semaphore};
+use tokio::task::JoinSet;
+
+/// Default cap on in-flight orders per plugin
+pub const DEFAULT_ORDER_CONCURRENCY: usize = 4;
+
+/// A registered plugin and the permits bounding its in-flight orders
+#[derive(Clone)]
+struct RegisteredPlugin {
+    plugin: Arc<dyn ExecutionPlugin>,
+    order_permits: Arc<Semaphore>,
+}
 
 /// Plugin registry for managing multiple execution backends
 pub struct PluginRegistry {
-    plugins: Arc<RwLock<HashMap<String, Arc<dyn ExecutionPlugin>>>>,
-    default_plugin: Arc<RwLock<Option<String>>>,
+    plugins: Arc<RwLock<HashMap<String, RegisteredPlugin>>>,
+    /// Default plugin name and its entry, cached so the common no-name
+    /// order path resolves with a single lock
+    default_plugin: Arc<RwLock<Option<(String, RegisteredPlugin)>>>,
+    order_concurrency: usize,
 }
 
 impl PluginRegistry {
     /// Create a new plugin registry
     pub fn new() -> Self {
+        Self::with_order_concurrency(DEFAULT_ORDER_CONCURRENCY)
+    }
+    
+    /// Create a registry that allows at most `order_concurrency` orders in
+    /// flight per plugin; further orders wait for a permit instead of
+    /// piling onto the exchange and tripping its rate limits
+    pub fn with_order_concurrency(order_concurrency: usize) -> Self {
         Self {
             plugins: Arc::new(RwLock::new(HashMap::new())),
             default_plugin: Arc::new(RwLock::new(None)),
+            order_concurrency: order_concurrency.max(1),
         }
     }
     
@@ -28,59 +50,74 @@ impl PluginRegistry {
     /// * `name` - Unique name for the plugin
     /// * `plugin` - Plugin instance
     pub async fn register(&self, name: String, plugin: Arc<dyn ExecutionPlugin>) {
+        let entry = RegisteredPlugin {
+            plugin,
+            order_permits: Arc::new(Semaphore::new(self.order_concurrency)),
+        };
         let mut plugins = self.plugins.write().await;
-        plugins.insert(name.clone(), plugin);
+        plugins.insert(name.clone(), entry.clone());
         
-        // Set as default if first plugin
+        // Set as default if first plugin (or refresh it if re-registered)
         let mut default = self.default_plugin.write().await;
-        if default.is_none() {
-            *default = Some(name);
+        if default.as_ref().map_or(true, |(default_name, _)| *default_name == name) {
+            *default = Some((name, entry));
         }
     }
     
     /// Set the default plugin
     pub async fn set_default(&self, name: String) -> Result<(), String> {
         let plugins = self.plugins.read().await;
-        if !plugins.contains_key(&name) {
-            return Err(format!("Plugin '{}' not found", name));
-        }
+        let entry = plugins.get(&name)
+            .cloned()
+            .ok_or_else(|| format!("Plugin '{}' not found", name))?;
         
         let mut default = self.default_plugin.write().await;
-        *default = Some(name);
+        *default = Some((name, entry));
         Ok(())
     }
     
     /// Get a plugin by name
     pub async fn get(&self, name: &str) -> Option<Arc<dyn ExecutionPlugin>> {
         let plugins = self.plugins.read().await;
-        plugins.get(name).cloned()
+        plugins.get(name).map(|entry| entry.plugin.clone())
     }
     
     /// Get the default plugin
     pub async fn get_default(&self) -> Option<Arc<dyn ExecutionPlugin>> {
-        let default_name = {
-            let default = self.default_plugin.read().await;
-            default.clone()?
-        };
-        
-        self.get(&default_name).await
+        let default = self.default_plugin.read().await;
+        default.as_ref().map(|(_, entry)| entry.plugin.clone())
+    }
+    
+    /// Get a registry entry (plugin plus order permits) by name
+    async fn get_entry(&self, name: &str) -> Option<RegisteredPlugin> {
+        let plugins = self.plugins.read().await;
+        plugins.get(name).cloned()
     }
     
     /// Execute order using specified plugin or default
+    ///
+    /// Waits for one of the plugin's order permits before dispatching, so a
+    /// burst of orders is queued here rather than fanned out to the exchange.
     pub async fn execute_order(
         &self,
         order: Order,
         plugin_name: Option<&str>,
     ) -> Result<ExecutionResult, Box<dyn std::error::Error + Send + Sync>> {
-        let plugin = if let Some(name) = plugin_name {
-            self.get(name).await
+        let entry = if let Some(name) = plugin_name {
+            self.get_entry(name).await
                 .ok_or_else(|| format!("Plugin '{}' not found", name))?
         } else {
-            self.get_default().await
+            self.default_plugin.read().await.as_ref()
+                .map(|(_, entry)| entry.clone())
                 .ok_or("No default plugin configured")?
         };
         
-        plugin.execute_order(order).await
+        if entry.order_permits.available_permits() == 0 {
+            tracing::debug!(plugin = %entry.plugin.name(), "order_concurrency_saturated_waiting");
+        }
+        let _permit = entry.order_permits.acquire().await?;
+        
+        entry.plugin.execute_order(order).await
     }
     
     /// Fetch market data using specified plugin or default
@@ -108,12 +145,29 @@ impl PluginRegistry {
     
     /// Health check all plugins
     pub async fn health_check_all(&self) -> HashMap<String, bool> {
-        let plugins = self.plugins.read().await;
-        let mut results = HashMap::new();
+        // Snapshot the plugins so the map lock isn't held across network calls
+        let plugins: Vec<(String, Arc<dyn ExecutionPlugin>)> = self.plugins.read().await
+            .iter()
+            .map(|(name, entry)| (name.clone(), entry.plugin.clone()))
+            .collect();
+        
+        // Checks are independent round-trips; run them concurrently.
+        // A check that panics leaves its plugin reported as unhealthy.
+        let mut results: HashMap<String, bool> = plugins.iter()
+            .map(|(name, _)| (name.clone(), false))
+            .collect();
+        let mut checks = JoinSet::new();
+        for (name, plugin) in plugins {
+            checks.spawn(async move {
+                let health = plugin.health_check().await.unwrap_or(false);
+                (name, health)
+            });
+        }
         
-        for (name, plugin) in plugins.iter() {
-            let health = plugin.health_check().await.unwrap_or(false);
-            results.insert(name.clone(), health);
+        while let Some(joined) = checks.join_next().await {
+            if let Ok((name, health)) = joined {
+                results.insert(name, health);
+            }
         }
         
         results
@@ -169,6 +223,22 @@ mod tests {
         assert_eq!(default.name(), "mock2");
     }
     
+    #[tokio::test]
+    async fn test_registry_reregistered_default_is_refreshed() {
+        let registry = PluginRegistry::new();
+        
+        let mut original = MockPlugin::new("original");
+        original.init(serde_json::json!({})).await.unwrap();
+        registry.register("mock1".to_string(), Arc::new(original)).await;
+        
+        let mut replacement = MockPlugin::new("replacement");
+        replacement.init(serde_json::json!({})).await.unwrap();
+        registry.register("mock1".to_string(), Arc::new(replacement)).await;
+        
+        let default = registry.get_default().await.unwrap();
+        assert_eq!(default.name(), "replacement");
+    }
+    
     #[tokio::test]
     async fn test_registry_execute_order() {
         let registry = PluginRegistry::new();
@@ -197,6 +267,37 @@ mod tests {
         assert!(result.success);
     }
     
+    #[tokio::test]
+    async fn test_registry_bounds_order_concurrency() {
+        let registry = Arc::new(PluginRegistry::with_order_concurrency(1));
+        
+        let mut mock_plugin = MockPlugin::new("mock1");
+        mock_plugin.init(serde_json::json!({})).await.unwrap();
+        registry.register("mock1".to_string(), Arc::new(mock_plugin)).await;
+        
+        let order = Order {
+            symbol: "BTC/USDT".to_string(),
+            side: OrderSide::Buy,
+            order_type: OrderType::Market,
+            quantity: 0.1,
+            price: Some(67500.0),
+            stop_loss: None,
+            take_profit: None,
+            confidence: 0.75,
+        };
+        
+        // Mock fills take ~50ms; with one permit two orders must run back to back
+        let start = std::time::Instant::now();
+        let (first, second) = tokio::join!(
+            registry.execute_order(order.clone(), None),
+            registry.execute_order(order, None)
+        );
+        
+        assert!(first.unwrap().success);
+        assert!(second.unwrap().success);
+        assert!(start.elapsed() >= std::time::Duration::from_millis(100));
+    }
+    
     #[tokio::test]
     async fn test_registry_list_plugins() {
         let registry = PluginRegistry::new();